@@ -14,8 +14,10 @@ with Connection() as connection:
         print(command)
         print(response)
 
+    state = {'running': True}
+
     def quit():
-        raise StopIteration
+        state['running'] = False
 
     def status():
         command, response = connection.status()
@@ -31,16 +33,16 @@ with Connection() as connection:
         print('s: machine status')
         print('q: quit')
 
-    while True:
+    dispatch = {
+        'p': payout,
+        'q': quit,
+        's': status,
+        'r': reset_dispenser,
+    }
+
+    while state['running']:
         print_usage()
         try:
-            {
-                'p': payout,
-                'q': quit,
-                's': status,
-                'r': reset_dispenser,
-            }[input()]()
+            dispatch[input()]()
         except KeyError:
             pass
-        except StopIteration:
-            break
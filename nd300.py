@@ -12,9 +12,10 @@ implemented.
 __author__ = 'Quentin Jeanmonod <q@truelevel.ch>'
 __version__ = '1.0.0'
 
-import serial
-from collections import namedtuple
-from enum import Enum
+import asyncio
+import struct
+from enum import Enum, IntEnum
+from functools import lru_cache
 
 
 def _int_to_bytes(i):
@@ -22,28 +23,49 @@ def _int_to_bytes(i):
     return int.to_bytes(i, 1, byteorder='big')
 
 
-class _Sender(Enum):
+class _Sender(IntEnum):
     '''Represents the two different parties that can communicate and
     their respective values on the protocol.
     '''
     user = 0x10
     machine = 0x01
 
+    # Keep the readable enum rendering, IntEnum would print the raw
+    # integer on recent Python versions.
+    __str__ = Enum.__str__
 
-class _CommandOrStatus(Enum):
+
+_NO_DATA = 'No data'
+
+_MSG_LEN = 6
+_START_BYTE = 0x01
+
+# The six byte fields of a frame, precompiled once.
+_FRAME = struct.Struct('>BBBBBB')
+
+_BAUDRATE = 9600
+
+# On the wire each byte occupies 11 bits with the start, parity and
+# stop bits. Three frame times (about 20ms) is plenty for a machine
+# that responds immediately, and it keeps a transient error from
+# blocking the caller for whole seconds.
+DEFAULT_TIMEOUT = _MSG_LEN * 11 / _BAUDRATE * 3
+
+
+class _CommandOrStatus(IntEnum):
     '''This class represents the byte occupying the cmd/status field
-    over the protocol.
+    over the protocol. Members are ints, so they compare directly to
+    the raw bytes of a frame.
     '''
 
+    __str__ = Enum.__str__
+
     @staticmethod
     def from_byte(value):
-        try:
-            return Command(value)
-        except ValueError:
-            return Status(value)
-
-    def is_user_command(self):
-        return self in Command
+        entry = _command_table[value] if 0 <= value < 256 else None
+        if entry is None:
+            raise ValueError(f'Unknown command or status byte: {value}')
+        return entry[0]
 
 
 class Command(_CommandOrStatus):
@@ -55,17 +77,6 @@ class Command(_CommandOrStatus):
     RESET_DISPENSER = 0x12
     MULTIPLE_MACHINES_PAYOUT = 0x13
 
-    def data_type(self):
-        return _commands_data_types[self]
-
-    @classmethod
-    def sender(_cls):
-        return _Sender.user
-
-    @classmethod
-    def pretty_arrow(_cls):
-        return '==>'
-
 
 class Status(_CommandOrStatus):
     '''Machine statuses the ND-300CM/KM can return after command calls.'''
@@ -85,18 +96,6 @@ class Status(_CommandOrStatus):
     CHECKSUM_ERROR = 0x0B
     LOW_POWER_ERROR = 0x0C
 
-    def data_type(self):
-        # All machine statuses have associated integer data.
-        return int
-
-    @classmethod
-    def sender(_cls):
-        return _Sender.machine
-
-    @classmethod
-    def pretty_arrow(_cls):
-        return '<=='
-
 
 _commands_data_types = {
     Command.SINGLE_MACHINE_PAYOUT: int,
@@ -106,12 +105,53 @@ _commands_data_types = {
 }
 
 
+# Dispatch tables keyed by member, replacing method dispatch on the
+# enums for every encode, decode and repr. All machine statuses have
+# associated integer data.
+_SENDER = {
+    **{command: _Sender.user for command in Command},
+    **{status: _Sender.machine for status in Status},
+}
+_DATA_TYPE = {
+    **_commands_data_types,
+    **{status: int for status in Status},
+}
+_ARROW = {Command: '==>', Status: '<=='}
+
+
+# The sender byte and the checksum contribution of the constant frame
+# fields only depend on the command, so they are computed once at
+# import time.
+_sender_and_checksum_base = {
+    member: (
+        _SENDER[member].value,
+        _START_BYTE + _SENDER[member].value + member.value,
+    )
+    for member in (*Command, *Status)
+}
+
+
+def _build_command_table():
+    '''Builds a byte-indexed table so that parsing a frame does not go
+    through the enum constructors.
+    '''
+    table = [None] * 256
+    for member in (*Command, *Status):
+        table[member.value] = (member, _SENDER[member], _DATA_TYPE[member])
+    return table
+
+
+_command_table = _build_command_table()
+
+
 class Message:
     '''Represents exchanged commands with the associated data.
     Enforces the correct sender and checksum for its command.
     '''
 
-    MESSAGE_LENGTH = 6
+    __slots__ = ('command', 'data')
+
+    MESSAGE_LENGTH = _MSG_LEN
 
     def __init__(self, command_or_status, data=None):
         '''command can represent a user command or a machine status.'''
@@ -127,19 +167,36 @@ class Message:
 
     def __repr__(self):
         '''Pretty print for debug.'''
-        if self.command.data_type() is None:
-            data = 'No data'
-        else:
-            data = self.data
-        return f'{self.command.pretty_arrow()} {self.command} {data}'
+        command = self.command
+        data = _NO_DATA if self.data is None else self.data
+        return f'{_ARROW[type(command)]} {command} {data}'
+
+    @classmethod
+    def _unchecked(cls, command, data):
+        '''Builds a Message without validation, for the parse path
+        where the data was already decoded through the parse tables.
+        '''
+        message = cls.__new__(cls)
+        message.command = command
+        message.data = data
+        return message
 
     @staticmethod
     def _compute_checksum(bytes_):
         '''As the documentation does not specify how to handle any
         overflow, this function makes the assumption that it must be
         discarded.
+
+        The bytes are folded as a single little endian integer whose
+        byte sum is reduced with pairwise shifted adds, so the whole
+        computation stays in C-level integer operations with no Python
+        iteration. This supports inputs up to eight bytes, more than a
+        whole frame.
         '''
-        return sum(bytes_) % 256
+        value = int.from_bytes(bytes_, 'little')
+        total = (value & 0x00FF00FF00FF00FF) + ((value >> 8) & 0x00FF00FF00FF00FF)
+        total = (total & 0x0000FFFF0000FFFF) + ((total >> 16) & 0x0000FFFF0000FFFF)
+        return (total + (total >> 32)) & 0xFF
 
     def to_bytes(self):
         '''Returns a bytes string that can be sent over the serial
@@ -151,36 +208,183 @@ class Message:
             # present on the protocol for commmands with no data.
             data = 0
 
-        bytes_ = bytes.fromhex(
-            f'01{self.command.sender().value:02X}00{self.command.value:02X}{data:02X}',
+        sender, checksum_base = _sender_and_checksum_base[self.command]
+        return _FRAME.pack(
+            _START_BYTE, sender, 0x00, self.command, data,
+            (checksum_base + data) & 0xFF,
         )
-        return bytes_ + _int_to_bytes(Message._compute_checksum(bytes_))
 
     @staticmethod
     def from_bytes(bytes_):
         '''Returns a Message from a bytes string.'''
-        if len(bytes_) != Message.MESSAGE_LENGTH:
-            raise ValueError(f'Expected a length {Message.MESSAGE_LENGTH} byte string')
-        if bytes_[0] != 1:
-            raise ValueError(f'Bad starting byte: expected 0x01, got {bytes_[0]}')
-        sender = _Sender(bytes_[1])
-        command = _CommandOrStatus.from_byte(bytes_[3])
-        data = command.data_type()(bytes_[4])
-        checksum = bytes_[5]
-        computed_checksum = Message._compute_checksum(bytes_[:-1])
+        if len(bytes_) != _MSG_LEN:
+            raise ValueError(f'Expected a length {_MSG_LEN} byte string')
+        start, sender_byte, zero, command_byte, data_byte, checksum = \
+            _FRAME.unpack(bytes_)
+        if start != _START_BYTE:
+            raise ValueError(f'Bad starting byte: expected 0x01, got {start}')
+        entry = _command_table[command_byte]
+        if entry is None:
+            raise ValueError(f'Unknown command or status byte: {command_byte}')
+        command, expected_sender, data_type = entry
+        data = None if data_type is None else data_type(data_byte)
+        computed_checksum = (
+            start + sender_byte + zero + command_byte + data_byte
+        ) & 0xFF
         if checksum != computed_checksum:
             raise ValueError(f'Bad checksum: received {checksum} but computed {computed_checksum}')
-        if sender != command.sender():
-            raise ValueError(f'Command {command} expected {command.sender()}, received {sender}')
-        return Message(command, data)
+        if sender_byte != expected_sender:
+            raise ValueError(
+                f'Command {command} expected {expected_sender}, received byte {sender_byte:#x}',
+            )
+        return Message._unchecked(command, data)
 
     def _validate(self):
-        expected_data_type =  self.command.data_type()
-        if not (self.data is None and expected_data_type is None
-                or isinstance(self.data, expected_data_type)):
-            raise TypeError(
-                f'Command {self.command} expected data type {expected_data_type}, got {type(self.data)}',
+        data = self.data
+        expected_data_type = _DATA_TYPE[self.command]
+        if expected_data_type is None:
+            if data is None:
+                return
+        # The data on the protocol is always a plain int, so the
+        # identity check skips isinstance's subclass walk.
+        elif type(data) is expected_data_type:
+            if not 0 <= data <= 255:
+                # The data must fit the single data byte of a frame.
+                raise ValueError(
+                    f'Command {self.command} expected a single byte of data, got {data}',
+                )
+            return
+        raise TypeError(
+            f'Command {self.command} expected data type {expected_data_type}, got {type(data)}',
+        )
+
+
+# During a payout the machine answers the same DISPENSING_BUSY frame
+# over and over, so the parsed Message is cached by raw frame. The
+# small bound keeps memory flat.
+_parse_cached = lru_cache(maxsize=32)(Message.from_bytes)
+
+
+# Messages and frames for commands without data are constant, so they
+# are built once at import time; send_command writes the frame as is
+# and returns the cached Message. This makes the status polling in
+# payout a single write per iteration, with no allocation at all.
+# Sharing the instances is safe since Message compares by value and
+# has no mutator.
+_no_data_messages = {
+    command: Message(command)
+    for command, data_type in _commands_data_types.items()
+    if data_type is None
+}
+_no_data_frames = {
+    command: message.to_bytes()
+    for command, message in _no_data_messages.items()
+}
+
+
+# Payout quantities fit a single byte, so all 256 possible payout
+# frames are encoded ahead of time for a total of 1.5KB; sending a
+# payout is then a list index and a write.
+_payout_frames = [
+    Message(Command.SINGLE_MACHINE_PAYOUT, quantity).to_bytes()
+    for quantity in range(256)
+]
+
+
+# The busy response repeated while dispensing, with its usual zero
+# data byte. Comparing raw frames against it is a plain memcmp, so the
+# read paths short-circuit on it before any parsing. Frames with a
+# different data byte simply fall through to the normal parse.
+_busy_message = Message(Status.DISPENSING_BUSY, 0)
+_busy_frame = _busy_message.to_bytes()
+
+
+def _pop_frame(buffer):
+    '''Pops and returns the first checksum verified frame of a
+    bytearray, or None when it does not hold a complete frame yet.
+    Every machine frame carries the 0x01 sender byte right after the
+    start of frame byte, so a candidate failing the checksum only
+    advances the scan by a single byte: discarding the whole window
+    would lock onto sender bytes forever after a lost byte.
+    '''
+    while True:
+        start = buffer.find(_START_BYTE)
+        if start == -1:
+            buffer.clear()
+            return None
+        if start > 0:
+            del buffer[:start]
+        if len(buffer) < _MSG_LEN:
+            return None
+        if buffer[_MSG_LEN - 1] == Message._compute_checksum(buffer[:_MSG_LEN - 1]):
+            frame = bytes(buffer[:_MSG_LEN])
+            del buffer[:_MSG_LEN]
+            return frame
+        # Not a real frame boundary, skip this start byte and rescan.
+        del buffer[:1]
+
+
+def parse_stream(bytes_):
+    '''Returns the list of messages contained in a capture of
+    consecutive frames, such as a recorded exchange with the machine.
+    The header and checksum checks are vectorized over the whole
+    capture, one pass per column instead of a Python loop per field,
+    which makes bulk decoding an order of magnitude faster than
+    calling from_bytes per frame. Requires NumPy, which is only needed
+    by this function.
+    '''
+    import numpy
+
+    stream = numpy.frombuffer(bytes_, dtype=numpy.uint8)
+    if len(stream) % _MSG_LEN != 0:
+        raise ValueError(f'Expected a multiple of {_MSG_LEN} bytes, got {len(stream)}')
+    frames = stream.reshape(-1, _MSG_LEN)
+    if not (frames[:, 0] == _START_BYTE).all():
+        raise ValueError('Bad starting byte in stream')
+    checksums = frames[:, :5].sum(axis=1, dtype=numpy.uint32) & 0xFF
+    if not (checksums == frames[:, 5]).all():
+        raise ValueError('Bad checksum in stream')
+    messages = []
+    for sender_byte, command_byte, data_byte in zip(
+            frames[:, 1], frames[:, 3], frames[:, 4]):
+        entry = _command_table[command_byte]
+        if entry is None:
+            raise ValueError(f'Unknown command or status byte: {command_byte}')
+        command, expected_sender, data_type = entry
+        if sender_byte != expected_sender:
+            raise ValueError(
+                f'Command {command} expected {expected_sender}, received byte {sender_byte:#x}',
             )
+        data = None if data_type is None else data_type(data_byte)
+        messages.append(Message._unchecked(command, data))
+    return messages
+
+
+def _enable_low_latency(serial_port):
+    '''Asks the kernel to forward received bytes immediately instead
+    of coalescing them, which saves up to 16ms per status poll on FTDI
+    adapters. This is best effort: ports or platforms that do not
+    support the ASYNC_LOW_LATENCY flag are left untouched.
+    '''
+    try:
+        serial_port.set_low_latency_mode(True)
+        return
+    except (AttributeError, NotImplementedError, ValueError):
+        # Not supported by this pyserial version, fall back to setting
+        # the flag through the serial ioctls directly.
+        pass
+    try:
+        import array
+        import fcntl
+        TIOCGSERIAL = 0x541E
+        TIOCSSERIAL = 0x541F
+        ASYNC_LOW_LATENCY = 1 << 13
+        serial_settings = array.array('i', [0] * 32)
+        fcntl.ioctl(serial_port.fileno(), TIOCGSERIAL, serial_settings)
+        serial_settings[4] |= ASYNC_LOW_LATENCY
+        fcntl.ioctl(serial_port.fileno(), TIOCSSERIAL, serial_settings)
+    except (ImportError, OSError):
+        pass
 
 
 class Connection:
@@ -188,13 +392,20 @@ class Connection:
     and get responses as messages. Can be used as a context manager.
     '''
 
-    def __init__(self, serial_file_name='/dev/ttyUSB0', timeout=10):
+    def __init__(self, serial_file_name='/dev/ttyUSB0', timeout=DEFAULT_TIMEOUT):
+        # Imported here so that importing nd300 for the Message API
+        # alone, as setup.py does for the version, does not pull in
+        # pyserial.
+        import serial
         self.serial = serial.Serial(
             serial_file_name,
-            9600,
+            _BAUDRATE,
             timeout=timeout,
+            write_timeout=0,
             parity=serial.PARITY_EVEN,
         )
+        _enable_low_latency(self.serial)
+        self._receive_buffer = bytearray()
 
     def close(self):
         self.serial.close()
@@ -207,32 +418,96 @@ class Connection:
 
     def send_command(self, command, data=None):
         '''Returns the message that was sent.'''
-        if not command.is_user_command():
+        if not isinstance(command, Command):
             raise ValueError(f'Expected an user command, got {command}')
 
-        message = Message(command, data)
-        bytes_to_send = message.to_bytes()
+        if data is None and command in _no_data_messages:
+            message = _no_data_messages[command]
+            bytes_to_send = _no_data_frames[command]
+        elif command is Command.SINGLE_MACHINE_PAYOUT:
+            # Validates the data, which makes the frame index safe.
+            message = Message(command, data)
+            bytes_to_send = _payout_frames[data]
+        else:
+            message = Message(command, data)
+            bytes_to_send = message.to_bytes()
         self.serial.write(bytes_to_send)
         return message
 
     def read_response(self):
-        '''Returns a message in the serial buffer.'''
-        bytes_ = self.serial.read(Message.MESSAGE_LENGTH)
-        if len(bytes_) == 0:
+        '''Returns a message in the serial buffer. Only checksum
+        verified frames are accepted and a failed candidate advances
+        the scan by a single byte, so a stream that lost a byte
+        resynchronizes on the next frame instead of erroring forever.
+        '''
+        buffer = self._receive_buffer
+        while True:
+            frame = _pop_frame(buffer)
+            if frame is not None:
+                break
+            chunk = self.serial.read(
+                max(self.serial.in_waiting, _MSG_LEN - len(buffer)),
+            )
+            if len(chunk) == 0:
+                if len(buffer) == 0:
+                    raise ValueError('Empty buffer, no response at this time.')
+                raise ValueError(f'Bad response: {bytes(buffer)}')
+            buffer.extend(chunk)
+        if frame == _busy_frame:
+            return _busy_message
+        return _parse_cached(frame)
+
+    def read_response_streaming(self):
+        '''Returns a message in the serial buffer, like read_response.
+        When the machine reports it is still dispensing, the next
+        status request is written while the tail of the current frame
+        is still being received, overlapping the two.
+        '''
+        if self._receive_buffer:
+            # Buffered leftovers are already received in full, so
+            # there is nothing to overlap with, but callers still rely
+            # on busy responses having their next status request sent.
+            message = self.read_response()
+            if message.command == Status.DISPENSING_BUSY:
+                self.send_command(Command.REQUEST_MACHINE_STATUS)
+            return message
+        head = self.serial.read(4)
+        if len(head) == 0:
             raise ValueError('Empty buffer, no response at this time.')
-        if len(bytes_) != Message.MESSAGE_LENGTH:
+        if len(head) == 4 and head[3] == Status.DISPENSING_BUSY:
+            self.send_command(Command.REQUEST_MACHINE_STATUS)
+        bytes_ = head + self.serial.read(_MSG_LEN - len(head))
+        if len(bytes_) != _MSG_LEN:
             raise ValueError(f'Bad response: {bytes_}')
-        return Message.from_bytes(bytes_)
+        if bytes_ == _busy_frame:
+            return _busy_message
+        return _parse_cached(bytes_)
 
     def payout(self, quantity):
         command = self.send_command(Command.SINGLE_MACHINE_PAYOUT, quantity)
-        response = self.read_response()
+        response = self.read_response_streaming()
         while (response.command == Status.DISPENSING_BUSY
                 or response.command == Status.PAYOUT_SUCCESSFUL):
-            self.send_command(Command.REQUEST_MACHINE_STATUS)
-            response = self.read_response()
+            if response.command != Status.DISPENSING_BUSY:
+                # Busy responses already had their status request sent
+                # by the streaming read.
+                self.send_command(Command.REQUEST_MACHINE_STATUS)
+            response = self.read_response_streaming()
         return command, response
 
+    def batch_payout(self, quantities):
+        '''Writes one payout frame per quantity back to back, then
+        drains as many responses. The machine buffers consecutive
+        commands, so the waits overlap instead of paying a full round
+        trip per payout. Returns the responses in order.
+        '''
+        frames = b''.join(
+            Message(Command.SINGLE_MACHINE_PAYOUT, quantity).to_bytes()
+            for quantity in quantities
+        )
+        self.serial.write(frames)
+        return [self.read_response() for _ in quantities]
+
     def status(self):
         command = self.send_command(Command.REQUEST_MACHINE_STATUS)
         response = self.read_response()
@@ -242,6 +517,98 @@ class Connection:
         return self.send_command(Command.RESET_DISPENSER)
 
 
+class _SerialProtocol(asyncio.Protocol):
+    '''Accumulates incoming bytes and splits them into fixed length
+    frames that can be awaited one by one.
+    '''
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.frames = asyncio.Queue()
+
+    def data_received(self, data):
+        self._buffer.extend(data)
+        while True:
+            frame = _pop_frame(self._buffer)
+            if frame is None:
+                break
+            self.frames.put_nowait(frame)
+
+
+class AsyncConnection:
+    '''Asyncio counterpart of Connection. Waiting for the machine's
+    responses does not block the event loop, so the payout polling can
+    overlap with other coroutines. Requires pyserial-asyncio. Can be
+    used as an async context manager.
+    '''
+
+    def __init__(self, transport, protocol, timeout):
+        '''Use the create coroutine instead of calling this directly.'''
+        self.transport = transport
+        self.protocol = protocol
+        self.timeout = timeout
+
+    @classmethod
+    async def create(cls, serial_file_name='/dev/ttyUSB0', timeout=DEFAULT_TIMEOUT):
+        '''Opens the serial connection on the running event loop.'''
+        import serial
+        import serial_asyncio
+        transport, protocol = await serial_asyncio.create_serial_connection(
+            asyncio.get_event_loop(),
+            _SerialProtocol,
+            serial_file_name,
+            baudrate=_BAUDRATE,
+            parity=serial.PARITY_EVEN,
+        )
+        return cls(transport, protocol, timeout)
+
+    def close(self):
+        self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, _exc_type, _exc_value, _traceback):
+        self.close()
+
+    async def send_command(self, command, data=None):
+        '''Returns the message that was sent.'''
+        if not isinstance(command, Command):
+            raise ValueError(f'Expected an user command, got {command}')
+
+        message = Message(command, data)
+        self.transport.write(message.to_bytes())
+        return message
+
+    async def read_response(self):
+        '''Returns a message in the serial buffer.'''
+        try:
+            bytes_ = await asyncio.wait_for(
+                self.protocol.frames.get(),
+                timeout=self.timeout,
+            )
+        except asyncio.TimeoutError:
+            raise ValueError('Empty buffer, no response at this time.')
+        return Message.from_bytes(bytes_)
+
+    async def payout(self, quantity):
+        command = await self.send_command(Command.SINGLE_MACHINE_PAYOUT, quantity)
+        response = await self.read_response()
+        while (response.command == Status.DISPENSING_BUSY
+                or response.command == Status.PAYOUT_SUCCESSFUL):
+            await self.send_command(Command.REQUEST_MACHINE_STATUS)
+            response = await self.read_response()
+        return command, response
+
+    async def status(self):
+        command = await self.send_command(Command.REQUEST_MACHINE_STATUS)
+        response = await self.read_response()
+        return command, response
+
+    async def reset_dispenser(self):
+        return await self.send_command(Command.RESET_DISPENSER)
+
+
 if __name__ == '__main__':
     import unittest
 
@@ -314,7 +681,93 @@ if __name__ == '__main__':
             with self.assertRaises(TypeError):
                 # Needs int data
                 _ = Message(Command.SINGLE_MACHINE_PAYOUT, 'Hello, world')
+            with self.assertRaises(ValueError):
+                # Data does not fit the data byte
+                _ = Message(Command.SINGLE_MACHINE_PAYOUT, 256)
+            with self.assertRaises(ValueError):
+                # Data must not be negative
+                _ = Message(Command.SINGLE_MACHINE_PAYOUT, -1)
             # This should not error out
             _ = Message(Command.SINGLE_MACHINE_PAYOUT, 231)
 
+    class _FakeSerial:
+        '''Replays a fixed byte stream for the framing tests.'''
+
+        in_waiting = 0
+
+        def __init__(self, bytes_):
+            self._bytes = bytes_
+
+        def read(self, length):
+            chunk, self._bytes = self._bytes[:length], self._bytes[length:]
+            return chunk
+
+    class FramingTests(unittest.TestCase):
+        def _connection(self, bytes_):
+            connection = Connection.__new__(Connection)
+            connection.serial = _FakeSerial(bytes_)
+            connection._receive_buffer = bytearray()
+            return connection
+
+        def test_read_response(self):
+            busy = Message(Status.DISPENSING_BUSY, 0)
+            connection = self._connection(busy.to_bytes() * 2)
+            self.assertEqual(connection.read_response(), busy)
+            self.assertEqual(connection.read_response(), busy)
+            with self.assertRaises(ValueError):
+                # Empty buffer
+                connection.read_response()
+
+        def test_dropped_byte_resynchronizes(self):
+            # The first frame lost its starting byte; every following
+            # frame must still be decoded.
+            busy = Message(Status.DISPENSING_BUSY, 0)
+            connection = self._connection(
+                busy.to_bytes()[1:] + busy.to_bytes() * 10,
+            )
+            for _ in range(10):
+                self.assertEqual(connection.read_response(), busy)
+            with self.assertRaises(ValueError):
+                # Empty buffer
+                connection.read_response()
+
+        def test_async_framer_resynchronizes(self):
+            busy = Message(Status.DISPENSING_BUSY, 0).to_bytes()
+            protocol = _SerialProtocol()
+            protocol.data_received(busy[1:] + busy[:3])
+            protocol.data_received(busy[3:] + busy * 10)
+            for _ in range(11):
+                self.assertEqual(protocol.frames.get_nowait(), busy)
+            self.assertTrue(protocol.frames.empty())
+
+    class ParseStreamTests(unittest.TestCase):
+        def setUp(self):
+            try:
+                import numpy  # noqa
+            except ImportError:
+                self.skipTest('numpy is not installed')
+
+        def test_parse_stream(self):
+            messages = [
+                Message(Status.DISPENSING_BUSY, 0),
+                Message(Status.PAYOUT_SUCCESSFUL, 3),
+                Message(Command.SINGLE_MACHINE_PAYOUT, 23),
+            ]
+            stream = b''.join(message.to_bytes() for message in messages)
+            self.assertEqual(parse_stream(stream), messages)
+
+        def test_parse_stream_errors(self):
+            with self.assertRaises(ValueError):
+                # Not a multiple of the frame length
+                parse_stream(b'\x01\x01\x00\xAA\x03')
+            with self.assertRaises(ValueError):
+                # Bad starting byte
+                parse_stream(b'\x00\x01\x00\xAA\x03\xAE')
+            with self.assertRaises(ValueError):
+                # Bad checksum
+                parse_stream(b'\x01\x01\x00\xAA\x03\xB0')
+            with self.assertRaises(ValueError):
+                # Bad sender
+                parse_stream(b'\x01\x10\x00\xAA\x03\xBE')
+
     unittest.main()